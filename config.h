@@ -117,6 +117,20 @@
  */
 #define ENABLE_ADC_LOGGING 1
 
+/** 
+ * @brief Enable per-command console output
+ * @note When enabled, prints every received command, the handler action and
+ *       the resulting system state. Logging runs in immediate mode, so in a
+ *       command flood this is several synchronous RTT writes per command in
+ *       the command work queue thread.
+ *       
+ *       Set to 0 to print only warnings and errors (fastest command rate):
+ *       the command printk output and the uart_cmd module's LOG_INF/LOG_DBG
+ *       messages are compiled out.
+ *       Set to 1 for development/debugging.
+ */
+#define ENABLE_CMD_LOGGING 0
+
 /** @} */ // end of features
 
 /**
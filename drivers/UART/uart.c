@@ -15,19 +15,24 @@
 #include "../drivers/dac/dac.h"
 #include "../drivers/timers/timer.h"
 
+// Per-command LOG_INF/LOG_DBG follow ENABLE_CMD_LOGGING; warnings and errors stay
+#if ENABLE_CMD_LOGGING
 LOG_MODULE_REGISTER(uart_cmd, LOG_LEVEL_DBG);
+#else
+LOG_MODULE_REGISTER(uart_cmd, LOG_LEVEL_WRN);
+#endif
 
 /* ============================================================
  *                    CONSTANTS & DEFINES
  * ============================================================ */
 
-// Timeout konstante
-#define TX_BUSY_TIMEOUT_ITERATIONS  1000
-#define TX_BUSY_WAIT_US             100
-
 // Broj elemenata u nizu
 #define ARRAY_SIZE(arr) (sizeof(arr) / sizeof((arr)[0]))
 
+// Per-command console output, compiled out unless ENABLE_CMD_LOGGING is set
+#define CMD_PRINTK(...) \
+    do { if (ENABLE_CMD_LOGGING) { printk(__VA_ARGS__); } } while (0)
+
 /* ============================================================
  *                    TYPE DEFINITIONS
  * ============================================================ */
@@ -52,10 +57,11 @@ static uint8_t m_rx_chunk[RX_CHUNK_SIZE];
 static char cmd_buffer[CMD_BUFFER_SIZE];
 static char pending_cmd[CMD_BUFFER_SIZE];  // Buffer for deferred processing
 static char tx_buffer[TX_BUFFER_SIZE];
+static char tx_pending[TX_BUFFER_SIZE];    // Responses queued while TX is busy
+static size_t tx_pending_len = 0;          // Guarded by irq_lock()
 static size_t cmd_index = 0;
 static bool cmd_started = false;
 static atomic_t tx_busy = ATOMIC_INIT(0);  // Race-safe TX flag
-static atomic_t cmd_pending = ATOMIC_INIT(0);  // Flag for pending command
 static nrfx_uarte_t uarte_inst = NRFX_UARTE_INSTANCE(UARTE_INST_IDX);
 
 volatile uint32_t current_frequency_hz = 1;
@@ -66,90 +72,107 @@ static atomic_t parameters_updated_flag = ATOMIC_INIT(0);  // Race-safe update f
 static void cmd_work_handler(struct k_work *work);
 K_WORK_DEFINE(cmd_work, cmd_work_handler);
 
+// Dedicated command work queue - commands don't queue behind system work items
+K_THREAD_STACK_DEFINE(cmd_workq_stack, CMD_WORKQ_STACK_SIZE);
+static struct k_work_q cmd_workq;
+
+// Queue of received commands - back-to-back frames are buffered, not dropped
+K_MSGQ_DEFINE(cmd_msgq, CMD_BUFFER_SIZE, CMD_QUEUE_DEPTH, 4);
+
 // Sockeet parametri
 static bool stimulation_running = false;
 static float voltage_amplitude = 1.0f;
 static uint16_t cathode_channels[16] = {0};
 
+// Test komanda sa dužinom izračunatom u vreme kompajliranja
+typedef struct {
+    const char *cmd;
+    size_t len;
+} test_cmd_t;
+
+// Compile error if a command would not fit in tx_buffer
+#define TEST_CMD(s) \
+    { (s), sizeof(s) - 1 + ZERO_OR_COMPILE_ERROR(sizeof(s) - 1 <= TX_BUFFER_SIZE) }
+
 // Test komande za periodično slanje
-static const char* test_commands[] = {
+static const test_cmd_t test_commands[] = {
     // === STRESS TEST SEQUENCE ===
     
     // 1. Basic start/stop cycle
-    ">SON<",
-    ">SOFF<",
-    ">SON<",
+    TEST_CMD(">SON<"),
+    TEST_CMD(">SOFF<"),
+    TEST_CMD(">SON<"),
     
     // 2. DAC ramp test (6 values)
-    ">SA;0000 0200 0400 0600 0800 0A00<",
+    TEST_CMD(">SA;0000 0200 0400 0600 0800 0A00<"),
     
     // 3. Full 16 MUX patterns
-    ">SC;0001 0002 0004 0008 0010 0020 0040 0080 0100 0200 0400 0800 1000 2000 4000 8000<",
+    TEST_CMD(">SC;0001 0002 0004 0008 0010 0020 0040 0080 0100 0200 0400 0800 1000 2000 4000 8000<"),
     
     // 4. Pulse width sweep (1-10)
-    ">PW;1<",
-    ">PW;2<",
-    ">PW;3<",
-    ">PW;4<",
-    ">PW;5<",
-    ">PW;6<",
-    ">PW;7<",
-    ">PW;8<",
-    ">PW;9<",
-    ">PW;A<",
+    TEST_CMD(">PW;1<"),
+    TEST_CMD(">PW;2<"),
+    TEST_CMD(">PW;3<"),
+    TEST_CMD(">PW;4<"),
+    TEST_CMD(">PW;5<"),
+    TEST_CMD(">PW;6<"),
+    TEST_CMD(">PW;7<"),
+    TEST_CMD(">PW;8<"),
+    TEST_CMD(">PW;9<"),
+    TEST_CMD(">PW;A<"),
     
     // 5. Frequency sweep
-    ">SF;1<",
-    ">SF;5<",
-    ">SF;A<",
-    ">SF;19<",
-    ">SF;32<",
-    ">SF;64<",
+    TEST_CMD(">SF;1<"),
+    TEST_CMD(">SF;5<"),
+    TEST_CMD(">SF;A<"),
+    TEST_CMD(">SF;19<"),
+    TEST_CMD(">SF;32<"),
+    TEST_CMD(">SF;64<"),
     
     // 6. Reduce to 8 pulses
-    ">SC;0001 0002 0004 0008 0010 0020 0040 0080<",
+    TEST_CMD(">SC;0001 0002 0004 0008 0010 0020 0040 0080<"),
     
     // 7. DAC full range test
-    ">SA;0000 0555 0AAA 0FFF<",
+    TEST_CMD(">SA;0000 0555 0AAA 0FFF<"),
     
     // 8. Single pulse mode
-    ">SC;0001<",
-    ">PW;1<",
-    ">SF;64<",
+    TEST_CMD(">SC;0001<"),
+    TEST_CMD(">PW;1<"),
+    TEST_CMD(">SF;64<"),
     
     // 9. Back to multi-pulse
-    ">SC;0001 0002 0004 0008<",
-    ">PW;5<",
-    ">SF;19<",
+    TEST_CMD(">SC;0001 0002 0004 0008<"),
+    TEST_CMD(">PW;5<"),
+    TEST_CMD(">SF;19<"),
     
     // 10. Edge cases - max values
-    ">SA;0FFF 0FFF 0FFF 0FFF<",
-    ">PW;A<",
+    TEST_CMD(">SA;0FFF 0FFF 0FFF 0FFF<"),
+    TEST_CMD(">PW;A<"),
     
     // 11. Edge cases - min values
-    ">SA;0000 0001 0002 0003<",
-    ">PW;1<",
+    TEST_CMD(">SA;0000 0001 0002 0003<"),
+    TEST_CMD(">PW;1<"),
     
     // 12. Rapid start/stop
-    ">SOFF<",
-    ">SON<",
-    ">SOFF<",
-    ">SON<",
+    TEST_CMD(">SOFF<"),
+    TEST_CMD(">SON<"),
+    TEST_CMD(">SOFF<"),
+    TEST_CMD(">SON<"),
     
     // 13. Walking bit patterns
-    ">SC;0001 0002 0004 0008 0010 0020 0040 0080<",
-    ">SC;0100 0200 0400 0800 1000 2000 4000 8000<",
+    TEST_CMD(">SC;0001 0002 0004 0008 0010 0020 0040 0080<"),
+    TEST_CMD(">SC;0100 0200 0400 0800 1000 2000 4000 8000<"),
     
     // 14. Combined patterns
-    ">SC;FFFF 0000 FFFF 0000<",
-    ">SC;5555 AAAA 5555 AAAA<",
+    TEST_CMD(">SC;FFFF 0000 FFFF 0000<"),
+    TEST_CMD(">SC;5555 AAAA 5555 AAAA<"),
     
     // 15. Final state - stable operation
-    ">SC;0001 0002 0004 0008<",
-    ">SA;0200 0400 0600 0800<",
-    ">PW;5<",
-    ">SF;A<",
-    ">SON<"
+    TEST_CMD(">SC;0001 0002 0004 0008<"),
+    TEST_CMD(">SA;0200 0400 0600 0800<"),
+    TEST_CMD(">PW;5<"),
+    TEST_CMD(">SF;A<"),
+    TEST_CMD(">SON<"),
 };
 static uint8_t current_cmd_index = 0;
 
@@ -185,33 +208,81 @@ static const cmd_entry_t cmd_table[] = {
     {"SC;",  3, true,  handle_sc},
 };
 
+/* ============================================================
+ *                    RESPONSE TX
+ * ============================================================ */
+
+// Pre-framed constant responses - no snprintf() per command
+static const char resp_ok[]  = ">OK<";
+static const char resp_err[] = ">ERR<";
+
+// A host keeping CMD_QUEUE_DEPTH commands in flight must never lose a response
+BUILD_ASSERT(CMD_QUEUE_DEPTH * (sizeof(resp_err) - 1) <= TX_BUFFER_SIZE,
+             "tx_pending cannot hold one response per queued command");
+
 /**
- * @brief Šalje odgovor nazad kroz UART (race-safe)
+ * @brief Pokreće TX iz tx_buffer (lock mora biti zauzet)
  */
-void uart_send_response(const char *response)
+static void tx_start(size_t len)
 {
-    nrfx_err_t status;
-    
-    // Wait for TX to complete with timeout
-    uint32_t timeout = TX_BUSY_TIMEOUT_ITERATIONS;
-    while (atomic_get(&tx_busy) && timeout > 0) {
-        k_busy_wait(TX_BUSY_WAIT_US);
-        timeout--;
+    nrfx_err_t status = nrfx_uarte_tx(&uarte_inst, (uint8_t*)tx_buffer, len, 0);
+    if (status != NRFX_SUCCESS) {
+        printk("Response TX failed: 0x%08X\n", (unsigned int)status);
+        atomic_set(&tx_busy, 0);  // Release lock on failure
     }
-    
-    // Atomic test-and-set to acquire TX lock
-    if (!atomic_cas(&tx_busy, 0, 1)) {
-        printk("WARNING: TX still busy, response dropped\n");
-        return;
+}
+
+/**
+ * @brief Šalje uokviren odgovor (race-safe, non-blocking)
+ * 
+ * Ako je TX slobodan, odgovor odmah ide na DMA. Inače se dodaje u tx_pending
+ * i svi odgovori nakupljeni tokom TX-a šalju se jednim transferom iz
+ * TX_DONE handlera (burst komandi -> jedan DMA transfer, ne N).
+ */
+static void send_frame(const char *frame, size_t len)
+{
+    bool dropped = false;
+    unsigned int key = irq_lock();
+    
+    if (atomic_cas(&tx_busy, 0, 1)) {
+        memcpy(tx_buffer, frame, len);  // EasyDMA needs the data in RAM
+        tx_start(len);
+    } else if (tx_pending_len + len <= sizeof(tx_pending)) {
+        memcpy(&tx_pending[tx_pending_len], frame, len);
+        tx_pending_len += len;
+    } else {
+        dropped = true;
     }
     
-    snprintf(tx_buffer, TX_BUFFER_SIZE, ">%s<", response);
+    irq_unlock(key);
     
-    status = nrfx_uarte_tx(&uarte_inst, (uint8_t*)tx_buffer, strlen(tx_buffer), 0);
-    if (status != NRFX_SUCCESS) {
-        printk("Response TX failed: 0x%08X\n", (unsigned int)status);
-        atomic_set(&tx_busy, 0);  // Release lock on failure
+    if (dropped) {
+        printk("WARNING: TX queue full, response dropped\n");
+    }
+}
+
+static inline void send_ok(void)
+{
+    send_frame(resp_ok, sizeof(resp_ok) - 1);
+}
+
+static inline void send_err(void)
+{
+    send_frame(resp_err, sizeof(resp_err) - 1);
+}
+
+/**
+ * @brief Šalje odgovor nazad kroz UART (race-safe)
+ */
+void uart_send_response(const char *response)
+{
+    char frame[TX_BUFFER_SIZE];
+    
+    int len = snprintf(frame, sizeof(frame), ">%s<", response);
+    if (len < 0) {
+        return;
     }
+    send_frame(frame, MIN((size_t)len, sizeof(frame) - 1));
 }
 
 uint32_t frequency_to_pause_ms(uint32_t freq_hz)
@@ -261,11 +332,11 @@ static void handle_son(const char *args)
     
     if (!timer_system_is_running()) {
         timer_system_start();
-        printk("    Action: START stimulation (RUN mode)\n");
-        uart_send_response("OK");
+        CMD_PRINTK("    Action: START stimulation (RUN mode)\n");
+        send_ok();
     } else {
-        printk("    Action: Already in RUN mode\n");
-        uart_send_response("ERR");
+        CMD_PRINTK("    Action: Already in RUN mode\n");
+        send_err();
     }
 }
 
@@ -280,11 +351,11 @@ static void handle_soff(const char *args)
     
     if (timer_system_is_running()) {
         timer_system_stop();
-        printk("    Action: STOP stimulation (STOP mode)\n");
-        uart_send_response("OK");
+        CMD_PRINTK("    Action: STOP stimulation (STOP mode)\n");
+        send_ok();
     } else {
-        printk("    Action: Already in STOP mode\n");
-        uart_send_response("ERR");
+        CMD_PRINTK("    Action: Already in STOP mode\n");
+        send_err();
     }
 }
 
@@ -303,13 +374,13 @@ static void handle_pw(const char *args)
             current_frequency_hz = max_freq_new;
         }
         current_pulse_width = pw;
-        printk("    Action: Set Pulse Width = %d (0x%02X)\n", 
+        CMD_PRINTK("    Action: Set Pulse Width = %d (0x%02X)\n", 
                (int)current_pulse_width, (int)current_pulse_width);
         atomic_set(&parameters_updated_flag, 1);
-        uart_send_response("OK");
+        send_ok();
     } else {
-        printk("    Action: Pulse Width out of range (%d, 0x%02X)\n", pw, pw);
-        uart_send_response("ERR");
+        CMD_PRINTK("    Action: Pulse Width out of range (%d, 0x%02X)\n", pw, pw);
+        send_err();
     }
 }
 
@@ -353,7 +424,7 @@ static void handle_sa(const char *args)
     
     if (count == 0) {
         LOG_WRN("SA: No DAC values parsed");
-        uart_send_response("ERR");
+        send_err();
         return;
     }
     
@@ -361,9 +432,9 @@ static void handle_sa(const char *args)
     timer_set_dac_values(values, count);
     
     LOG_INF("SA: Set %d DAC values", count);
-    printk("    Action: Set %d DAC values\n", count);
+    CMD_PRINTK("    Action: Set %d DAC values\n", count);
     
-    uart_send_response("OK");
+    send_ok();
 }
 
 /**
@@ -378,7 +449,7 @@ static void handle_sf(const char *args)
         uint32_t max_freq = get_max_frequency(current_pulse_width);
         if (freq > max_freq) {
             LOG_WRN("Frequency %d Hz too high for pulse width %u", freq, (unsigned)current_pulse_width);
-            uart_send_response("ERR");
+            send_err();
             return;
         }
         
@@ -388,10 +459,10 @@ static void handle_sf(const char *args)
         
         uint32_t pause = frequency_to_pause_ms(freq);
         LOG_INF("Frequency set to %d Hz (pause: %u ms)", freq, pause);
-        uart_send_response("OK");
+        send_ok();
     } else {
-        printk("    Action: Frequency out of range (%d Hz, hex: 0x%02X)\n", freq, freq);
-        uart_send_response("ERR");
+        CMD_PRINTK("    Action: Frequency out of range (%d Hz, hex: 0x%02X)\n", freq, freq);
+        send_err();
     }
 }
 
@@ -435,7 +506,7 @@ static void handle_sc(const char *args)
     
     if (count == 0) {
         LOG_WRN("SC: No patterns parsed");
-        uart_send_response("ERR");
+        send_err();
         return;
     }
     
@@ -444,9 +515,9 @@ static void handle_sc(const char *args)
     
     uint8_t active = timer_get_pulse_count();
     LOG_INF("SC: Set %d patterns, active pulses: %d", count, active);
-    printk("    Action: Set %d MUX patterns, active pulses: %d\n", count, active);
+    CMD_PRINTK("    Action: Set %d MUX patterns, active pulses: %d\n", count, active);
     
-    uart_send_response("OK");
+    send_ok();
 }
 
 /* ============================================================
@@ -458,7 +529,7 @@ static void handle_sc(const char *args)
  */
 static void print_current_state(void)
 {
-    printk("    Current State: %s, PW=%d(0x%02X), U=%.1fV, F=%uHz(0x%02X)\n\n", 
+    CMD_PRINTK("    Current State: %s, PW=%d(0x%02X), U=%.1fV, F=%uHz(0x%02X)\n\n", 
            stimulation_running ? "RUN" : "STOP",
            (int)current_pulse_width, (int)current_pulse_width,
            voltage_amplitude, 
@@ -470,7 +541,7 @@ static void print_current_state(void)
  */
 static void process_command(const char *cmd)
 {
-    printk("\n>>> Command received: '%s'\n", cmd);
+    CMD_PRINTK("\n>>> Command received: '%s'\n", cmd);
     
     // Prolazi kroz lookup tabelu i traži odgovarajući handler
     for (size_t i = 0; i < ARRAY_SIZE(cmd_table); i++) {
@@ -490,26 +561,25 @@ static void process_command(const char *cmd)
     }
     
     // Nije pronađena nijedna komanda
-    printk("    Action: Unknown command\n");
-    uart_send_response("ERR");
+    CMD_PRINTK("    Action: Unknown command\n");
+    send_err();
     print_current_state();
 }
 
 /**
  * @brief Work handler for deferred command processing
  * 
- * This runs in system workqueue thread context, NOT in ISR.
+ * This runs in the dedicated uart_cmd workqueue thread, NOT in ISR.
  * All printk() and LOG calls are safe here without blocking timers.
  */
 static void cmd_work_handler(struct k_work *work)
 {
     ARG_UNUSED(work);
     
-    // Process the pending command
-    process_command(pending_cmd);
-    
-    // Clear the pending flag to allow next command
-    atomic_set(&cmd_pending, 0);
+    // Drain all queued commands in arrival order
+    while (k_msgq_get(&cmd_msgq, pending_cmd, K_NO_WAIT) == 0) {
+        process_command(pending_cmd);
+    }
 }
 
 /* ============================================================
@@ -522,27 +592,44 @@ static void uarte_handler(nrfx_uarte_event_t const *p_event, void *p_context)
     switch (p_event->type)
     {
         case NRFX_UARTE_EVT_TX_DONE:
-            atomic_set(&tx_busy, 0);  // Release TX lock
+        {
+            // Same lock as send_frame(): a higher-priority ISR appending a
+            // response must not race with taking and resetting tx_pending
+            unsigned int key = irq_lock();
+            size_t len = tx_pending_len;
+            if (len > 0) {
+                // Flush every response queued during this TX in one transfer
+                memcpy(tx_buffer, tx_pending, len);
+                tx_pending_len = 0;
+            } else {
+                atomic_set(&tx_busy, 0);  // Release TX lock
+            }
+            irq_unlock(key);
+            
+            if (len > 0) {
+                tx_start(len);  // Keeps TX lock held
+            }
             break;
+        }
             
         case NRFX_UARTE_EVT_RX_DONE:
         {
             char received_char = (char)m_rx_chunk[0];
             
             if (received_char == '>') {
+                // Buffer is reused as-is: '<' writes the terminator, so
+                // clearing all CMD_BUFFER_SIZE bytes per frame is not needed
                 cmd_started = true;
                 cmd_index = 0;
-                memset(cmd_buffer, 0, sizeof(cmd_buffer));
             }
             else if (received_char == '<') {
                 if (cmd_started && cmd_index > 0) {
                     cmd_buffer[cmd_index] = '\0';
-                    // Defer processing to work queue (non-blocking)
-                    if (atomic_cas(&cmd_pending, 0, 1)) {
-                        strncpy(pending_cmd, cmd_buffer, CMD_BUFFER_SIZE);
-                        k_work_submit(&cmd_work);
+                    // Queue and defer processing to work queue (non-blocking)
+                    if (k_msgq_put(&cmd_msgq, cmd_buffer, K_NO_WAIT) == 0) {
+                        k_work_submit_to_queue(&cmd_workq, &cmd_work);
                     }
-                    // If cmd_pending was already set, command is dropped
+                    // If the queue is full, command is dropped
                 }
                 cmd_started = false;
                 cmd_index = 0;
@@ -594,20 +681,19 @@ static void tx_timer_handler(struct k_timer *timer)
         return;
     }
     
-    const char* cmd = test_commands[current_cmd_index];
+    const test_cmd_t *cmd = &test_commands[current_cmd_index];
     
-    strncpy(tx_buffer, cmd, TX_BUFFER_SIZE - 1);
-    tx_buffer[TX_BUFFER_SIZE - 1] = '\0';
+    memcpy(tx_buffer, cmd->cmd, cmd->len);  // EasyDMA needs the data in RAM
     
-    printk("[TX] Sending test command: %s\n", tx_buffer);
+    CMD_PRINTK("[TX] Sending test command: %s\n", cmd->cmd);
     
-    status = nrfx_uarte_tx(&uarte_inst, (uint8_t*)tx_buffer, strlen(tx_buffer), 0);
+    status = nrfx_uarte_tx(&uarte_inst, (uint8_t*)tx_buffer, cmd->len, 0);
     if (status != NRFX_SUCCESS) {
         printk("TX failed: 0x%08X\n", (unsigned int)status);
         atomic_set(&tx_busy, 0);  // Release lock on failure
     }
     
-    current_cmd_index = (current_cmd_index + 1) % (sizeof(test_commands) / sizeof(test_commands[0]));
+    current_cmd_index = (current_cmd_index + 1) % ARRAY_SIZE(test_commands);
 }
 
 K_TIMER_DEFINE(tx_timer, tx_timer_handler, NULL);
@@ -622,6 +708,15 @@ K_TIMER_DEFINE(tx_timer, tx_timer_handler, NULL);
 int uart_init(void)
 {
     nrfx_err_t status;
+    static const struct k_work_queue_config cmd_workq_cfg = {
+        .name = "uart_cmd",
+    };
+
+    // Command work queue must run before RX can submit work to it
+    k_work_queue_init(&cmd_workq);
+    k_work_queue_start(&cmd_workq, cmd_workq_stack,
+                       K_THREAD_STACK_SIZEOF(cmd_workq_stack),
+                       CMD_WORKQ_PRIORITY, &cmd_workq_cfg);
 
 #if defined(__ZEPHYR__)
     IRQ_CONNECT(NRFX_IRQ_NUMBER_GET(NRF_UARTE_INST_GET(UARTE_INST_IDX)), 
@@ -12,6 +12,9 @@
 #define UARTE_RX_PIN 8
 #define RX_CHUNK_SIZE 1
 #define CMD_BUFFER_SIZE 128
+#define CMD_QUEUE_DEPTH 8     // Commands buffered while work handler is busy
+#define CMD_WORKQ_STACK_SIZE 2048
+#define CMD_WORKQ_PRIORITY   CONFIG_SYSTEM_WORKQUEUE_PRIORITY  // Cooperative (-1)
 #define TX_BUFFER_SIZE 128
 #define UART_BUF_SIZE            32
 #define UART_RX_TIMEOUT_MS       100
@@ -48,6 +51,10 @@ int uart_send(const char *data);
 /**
  * @brief Šalje formatiran odgovor (>response<)
  * @param response Sadržaj odgovora (bez > i <)
+ * @note Ne blokira - ako je TX zauzet, odgovor ide u red i šalje se zajedno
+ *       sa ostalim odgovorima čim se tekući TX završi. Red je zaštićen sa
+ *       irq_lock() i u send_frame() i u TX_DONE handleru, pa je poziv
+ *       bezbedan i iz ISR-a.
  */
 void uart_send_response(const char *response);
 
@@ -89,6 +89,9 @@ typedef enum {
     STATE_PAUSE
 } state_t;
 
+// MUX_ADVANCE_TIME_US in state timer ticks (constant, computed once in timer_init)
+static uint32_t mux_advance_ticks;
+
 static volatile state_t current_state = STATE_PULSE;
 static volatile uint32_t state_transitions = 0;
 static volatile bool system_running = true;
@@ -97,12 +100,13 @@ static void prepare_outputs_preload_for_current_state(void)
 {
     uint16_t pattern;
     uint16_t dac_value;
-    uint8_t next_idx;
 
     if (current_state == STATE_PULSE) {
-        next_idx = current_pulse_idx + 1;
-        pattern = (next_idx >= active_pulse_count) ? MUX_PATTERN_PAUSE : mux_patterns[next_idx];
-        dac_value = (next_idx >= active_pulse_count) ? 0 : dac_values[next_idx];
+        // Snapshot volatiles once instead of re-reading them per use
+        uint8_t next_idx = current_pulse_idx + 1;
+        bool last_pulse = (next_idx >= active_pulse_count);
+        pattern = last_pulse ? MUX_PATTERN_PAUSE : mux_patterns[next_idx];
+        dac_value = last_pulse ? 0 : dac_values[next_idx];
     } else {
         pattern = mux_patterns[0];
         dac_value = dac_values[0];
@@ -149,6 +153,11 @@ static void state_timer_handler(nrf_timer_event_t event_type, void * p_context)
     
     state_transitions++;
     
+    // Snapshot volatile state once - the writers are thread code, which cannot
+    // preempt this ISR, and no other ISR writes these variables
+    const state_t state = current_state;
+    const uint8_t pulse_count = active_pulse_count;
+    
     // Check UART parameter updates (atomic test-and-clear)
     if (uart_test_and_clear_update_flag()) {
         uint32_t new_pulse_us = uart_get_pulse_width_ms() * 100;
@@ -165,16 +174,16 @@ static void state_timer_handler(nrf_timer_event_t event_type, void * p_context)
                                     pulse_ticks * 2 + 30,
                                     NRF_TIMER_SHORT_COMPARE5_CLEAR_MASK, false);
         
-        if (current_state == STATE_PULSE) {
+        if (state == STATE_PULSE) {
             nrfx_timer_enable(&timer_pulse);
         }
     }
     
     // State transitions
-    if (current_state == STATE_PULSE) {
-        current_pulse_idx++;
+    if (state == STATE_PULSE) {
+        uint8_t next_idx = current_pulse_idx + 1;
         
-        if (current_pulse_idx >= active_pulse_count) {
+        if (next_idx >= pulse_count) {
             // All pulses done, go to PAUSE
             nrfx_timer_disable(&timer_pulse);
             current_state = STATE_PAUSE;
@@ -185,7 +194,7 @@ static void state_timer_handler(nrf_timer_event_t event_type, void * p_context)
             
             // Calculate pause duration
             uint32_t freq_hz = uart_get_frequency_hz();
-            uint32_t active_period_us = single_pulse_us * active_pulse_count;
+            uint32_t active_period_us = single_pulse_us * pulse_count;
             uint32_t total_period_us = 1000000 / freq_hz;
             uint32_t pause_us = (total_period_us > active_period_us) ? 
                                (total_period_us - active_period_us) : 0;
@@ -197,15 +206,15 @@ static void state_timer_handler(nrf_timer_event_t event_type, void * p_context)
             
             nrfx_timer_compare(&timer_state, NRF_TIMER_CC_CHANNEL0, pause_ticks, true);
             
-            uint32_t advance_ticks = nrfx_timer_us_to_ticks(&timer_state, MUX_ADVANCE_TIME_US);
-            uint32_t mux_ticks = (pause_ticks > advance_ticks) ? 
-                                 (pause_ticks - advance_ticks) : 
+            uint32_t mux_ticks = (pause_ticks > mux_advance_ticks) ? 
+                                 (pause_ticks - mux_advance_ticks) : 
                                  (pause_ticks / 2);
             nrfx_timer_compare(&timer_state, NRF_TIMER_CC_CHANNEL1, mux_ticks, true);
             prepare_outputs_preload_for_current_state();
             nrfx_timer_enable(&timer_state);
         } else {
             // Continue with next pulse
+            current_pulse_idx = next_idx;
             nrfx_timer_clear(&timer_pulse);
             
             nrfx_timer_disable(&timer_state);
@@ -214,15 +223,14 @@ static void state_timer_handler(nrf_timer_event_t event_type, void * p_context)
             
             nrfx_timer_compare(&timer_state, NRF_TIMER_CC_CHANNEL0, pulse_ticks, true);
             
-            uint32_t advance_ticks = nrfx_timer_us_to_ticks(&timer_state, MUX_ADVANCE_TIME_US);
-            uint32_t mux_ticks = (pulse_ticks > advance_ticks) ? 
-                                 (pulse_ticks - advance_ticks) : 
+            uint32_t mux_ticks = (pulse_ticks > mux_advance_ticks) ? 
+                                 (pulse_ticks - mux_advance_ticks) : 
                                  (pulse_ticks / 2);
             nrfx_timer_compare(&timer_state, NRF_TIMER_CC_CHANNEL1, mux_ticks, true);
             prepare_outputs_preload_for_current_state();
             nrfx_timer_enable(&timer_state);
         }
-    } else if (current_state == STATE_PAUSE) {
+    } else if (state == STATE_PAUSE) {
         // After PAUSE, restart with first pulse
         nrfx_timer_enable(&timer_pulse);
         current_state = STATE_PULSE;
@@ -237,9 +245,8 @@ static void state_timer_handler(nrf_timer_event_t event_type, void * p_context)
         
         nrfx_timer_compare(&timer_state, NRF_TIMER_CC_CHANNEL0, pulse_ticks, true);
         
-        uint32_t advance_ticks = nrfx_timer_us_to_ticks(&timer_state, MUX_ADVANCE_TIME_US);
-        uint32_t mux_ticks = (pulse_ticks > advance_ticks) ? 
-                             (pulse_ticks - advance_ticks) : 
+        uint32_t mux_ticks = (pulse_ticks > mux_advance_ticks) ? 
+                             (pulse_ticks - mux_advance_ticks) : 
                              (pulse_ticks / 2);
         nrfx_timer_compare(&timer_state, NRF_TIMER_CC_CHANNEL1, mux_ticks, true);
         prepare_outputs_preload_for_current_state();
@@ -287,6 +294,9 @@ nrfx_err_t timer_init(uint32_t pulse_width_us)
         return status;
     }
     
+    // Hoisted out of the state ISR - the pre-load advance never changes
+    mux_advance_ticks = nrfx_timer_us_to_ticks(&timer_state, MUX_ADVANCE_TIME_US);
+    
     return NRFX_SUCCESS;
 }
 
@@ -319,9 +329,8 @@ void timer_set_state_pulse(uint32_t single_pulse_us)
     nrfx_timer_compare(&timer_state, NRF_TIMER_CC_CHANNEL0, pulse_ticks, true);
     
     // Setup CC1 for MUX pre-load (ADVANCE_TIME before CC0)
-    uint32_t advance_ticks = nrfx_timer_us_to_ticks(&timer_state, MUX_ADVANCE_TIME_US);
-    uint32_t mux_ticks = (pulse_ticks > advance_ticks) ? 
-                         (pulse_ticks - advance_ticks) : 
+    uint32_t mux_ticks = (pulse_ticks > mux_advance_ticks) ? 
+                         (pulse_ticks - mux_advance_ticks) : 
                          (pulse_ticks / 2);
     nrfx_timer_compare(&timer_state, NRF_TIMER_CC_CHANNEL1, mux_ticks, true);
     prepare_outputs_preload_for_current_state();
@@ -339,9 +348,8 @@ void timer_set_state_pause(uint32_t pause_us)
     nrfx_timer_compare(&timer_state, NRF_TIMER_CC_CHANNEL0, pause_ticks, true);
     
     // Setup CC1 for MUX pre-load
-    uint32_t advance_ticks = nrfx_timer_us_to_ticks(&timer_state, MUX_ADVANCE_TIME_US);
-    uint32_t mux_ticks = (pause_ticks > advance_ticks) ? 
-                         (pause_ticks - advance_ticks) : 
+    uint32_t mux_ticks = (pause_ticks > mux_advance_ticks) ? 
+                         (pause_ticks - mux_advance_ticks) : 
                          (pause_ticks / 2);
     nrfx_timer_compare(&timer_state, NRF_TIMER_CC_CHANNEL1, mux_ticks, true);
     prepare_outputs_preload_for_current_state();